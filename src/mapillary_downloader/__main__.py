@@ -9,7 +9,7 @@ from mapillary_downloader.client import MapillaryClient
 from mapillary_downloader.downloader import MapillaryDownloader, clean_log_only_dirs
 from mapillary_downloader.ia_stats import show_stats
 from mapillary_downloader.logging_config import setup_logging
-from mapillary_downloader.webp_converter import check_cwebp_available
+from mapillary_downloader.webp_converter import check_webp_available
 
 
 def main():
@@ -114,12 +114,10 @@ def main():
     # WebP is enabled by default, disabled with --no-webp
     convert_webp = not args.no_webp
 
-    # Check for cwebp binary if WebP conversion is enabled
+    # Check for Pillow WebP support if WebP conversion is enabled
     if convert_webp:
-        if not check_cwebp_available():
-            logger.error(
-                "Error: cwebp binary not found. Install webp package (e.g., apt install webp) or use --no-webp"
-            )
+        if not check_webp_available():
+            logger.error("Error: Pillow was built without WebP support. Reinstall Pillow or use --no-webp")
             sys.exit(1)
         logger.info("WebP conversion enabled - images will be converted after download")
 
@@ -3,14 +3,67 @@
 import logging
 import time
 import requests
-from requests.exceptions import RequestException
+from mapillary_downloader.utils import http_get_with_retry
 
 logger = logging.getLogger("mapillary_downloader")
 
 
+def _pagination_delay(response):
+    """Work out how long to pause before fetching the next page.
+
+    The search API allows 10,000 requests/minute; when rate-limit headers
+    show plenty of headroom there is no reason to sleep at all.
+
+    Args:
+        response: requests.Response from the last page fetch
+
+    Returns:
+        Delay in seconds (0 when no sleep is needed)
+    """
+    try:
+        remaining = int(response.headers.get("X-RateLimit-Remaining"))
+    except (AttributeError, TypeError, ValueError):
+        # Headers absent or unparseable: keep the flat courtesy sleep
+        return 0.01
+
+    if remaining > 100:
+        return 0
+
+    try:
+        reset = float(response.headers.get("X-RateLimit-Reset", 0))
+    except (TypeError, ValueError):
+        reset = 0
+
+    # Spread the remaining budget over the time left in the window
+    return max(0.01, (reset - time.time()) / max(remaining, 1))
+
+
 class MapillaryClient:
     """Client for interacting with Mapillary API v4."""
 
+    # Metadata fields requested for every image; the quality-specific
+    # thumb URL field is appended per request
+    FIELDS = (
+        "id",
+        "captured_at",
+        "compass_angle",
+        "computed_compass_angle",
+        "geometry",
+        "computed_geometry",
+        "altitude",
+        "computed_altitude",
+        "is_pano",
+        "sequence",
+        "camera_type",
+        "camera_parameters",
+        "make",
+        "model",
+        "exif_orientation",
+        "computed_rotation",
+        "height",
+        "width",
+    )
+
     def __init__(self, access_token):
         """Initialize the client with an access token.
 
@@ -21,6 +74,7 @@ class MapillaryClient:
         self.base_url = "https://graph.mapillary.com"
         self.session = requests.Session()
         self.session.headers.update({"Authorization": f"OAuth {access_token}"})
+        self._base_fields = ",".join(self.FIELDS)
 
     def get_user_images(self, username, quality, bbox=None, limit=2000, start_url=None, on_page=None):
         """Get images uploaded by a specific user.
@@ -39,29 +93,7 @@ class MapillaryClient:
         params = {
             "creator_username": username,
             "limit": limit,
-            "fields": ",".join(
-                [
-                    "id",
-                    "captured_at",
-                    "compass_angle",
-                    "computed_compass_angle",
-                    "geometry",
-                    "computed_geometry",
-                    "altitude",
-                    "computed_altitude",
-                    "is_pano",
-                    "sequence",
-                    "camera_type",
-                    "camera_parameters",
-                    "make",
-                    "model",
-                    "exif_orientation",
-                    "computed_rotation",
-                    "height",
-                    "width",
-                    f"thumb_{quality}_url",
-                ]
-            ),
+            "fields": f"{self._base_fields},thumb_{quality}_url",
         }
 
         if bbox:
@@ -76,22 +108,7 @@ class MapillaryClient:
         total_fetched = 0
 
         while url:
-            max_retries = 10
-            base_delay = 1.0
-
-            for attempt in range(max_retries):
-                try:
-                    response = self.session.get(url, params=params, timeout=60)
-                    response.raise_for_status()
-                    break
-                except RequestException as e:
-                    if attempt == max_retries - 1:
-                        raise
-
-                    delay = base_delay * (2**attempt)
-                    logger.warning(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
-                    logger.info(f"Retrying in {delay:.1f} seconds...")
-                    time.sleep(delay)
+            response = http_get_with_retry(self.session, url, params=params, max_retries=10, timeout=60)
 
             data = response.json()
             images = data.get("data", [])
@@ -112,4 +129,6 @@ class MapillaryClient:
                 on_page(url)
 
             # Rate limiting: 10,000 requests/minute for search API
-            time.sleep(0.01)
+            delay = _pagination_delay(response)
+            if delay:
+                time.sleep(delay)
@@ -3,20 +3,19 @@
 import gzip
 import json
 import logging
-import re
+import os
 import shutil
 import threading
 import time
 from pathlib import Path
-import requests
 from PIL import Image
-from mapillary_downloader.utils import format_size, format_time, get_cache_dir, safe_json_save
+from mapillary_downloader.utils import format_size, format_time, get_cache_dir
 from mapillary_downloader.ia_meta import generate_ia_metadata
 from mapillary_downloader.ia_check import check_ia_exists
 from mapillary_downloader.worker import worker_process
 from mapillary_downloader.worker_pool import AdaptiveWorkerPool
 from mapillary_downloader.metadata_reader import MetadataReader
-from mapillary_downloader.tar_sequences import tar_sequence_directories
+from mapillary_downloader.tar_sequences import DATE_DIR_RE, tar_sequence_directories
 from mapillary_downloader.logging_config import add_file_handler
 
 logger = logging.getLogger("mapillary_downloader")
@@ -115,26 +114,48 @@ class MapillaryDownloader:
 
         self.metadata_file = self.output_dir / "metadata.jsonl"
         self.progress_file = self.output_dir / "progress.json"
+        self.progress_log = self.output_dir / f"downloaded.{self.quality}.log"
         self.cursor_file = self.output_dir / ".api_cursor"
         self.downloaded = self._load_progress()
+        # Append-only progress log: one id per line, O(1) per checkpoint
+        self._progress_log_f = open(self.progress_log, "a", buffering=1 << 16)
+        self._progress_writes = 0
         self.baseline_bytes = self._baseline_bytes()
         self._last_save_time = time.time()
 
     def _load_progress(self):
         """Load previously downloaded image IDs for this quality."""
+        if self.progress_log.exists():
+            with open(self.progress_log) as f:
+                return {line.strip() for line in f if line.strip()}
+
+        # Migrate from the legacy progress.json full-rewrite format
         if self.progress_file.exists():
             with open(self.progress_file) as f:
                 data = json.load(f)
-            return set(data.get(str(self.quality), []))
+            downloaded = set(data.get(str(self.quality), []))
+            if downloaded:
+                with open(self.progress_log, "w") as f:
+                    f.writelines(f"{image_id}\n" for image_id in downloaded)
+            return downloaded
+
         return set()
 
+    def _mark_downloaded(self, image_id):
+        """Record a downloaded image ID in the append-only progress log."""
+        self.downloaded.add(image_id)
+        self._progress_log_f.write(f"{image_id}\n")
+        self._progress_writes += 1
+        if self._progress_writes % 1024 == 0:
+            self._save_progress()
+
     def _baseline_bytes(self):
         """Sum sizes of already-downloaded image files in date directories."""
         total = 0
         for child in self.output_dir.iterdir():
             if not child.is_dir():
                 continue
-            if not (re.match(r"\d{4}-\d{2}-\d{2}$", child.name) or child.name == "unknown-date"):
+            if not (DATE_DIR_RE.match(child.name) or child.name == "unknown-date"):
                 continue
             for f in child.rglob("*"):
                 if f.is_file():
@@ -142,17 +163,12 @@ class MapillaryDownloader:
         return total
 
     def _save_progress(self):
-        """Save progress to disk atomically, per-quality."""
-        progress = {}
-        if self.progress_file.exists():
-            with open(self.progress_file) as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    progress = data
-
-        progress[str(self.quality)] = list(self.downloaded)
-
-        safe_json_save(self.progress_file, progress)
+        """Flush the append-only progress log to disk."""
+        self._progress_log_f.flush()
+        # fdatasync skips the inode mtime flush; the file size update it
+        # needs to make appended data readable is still persisted.
+        # macOS has no fdatasync, so fall back to fsync there.
+        getattr(os, "fdatasync", os.fsync)(self._progress_log_f.fileno())
 
     def _create_thumbnail(self):
         """Create a 256x256 JPEG thumbnail at the collection root for IA."""
@@ -183,7 +199,17 @@ class MapillaryDownloader:
         submitted = 0
         skipped = 0
 
-        for line in file_handle:
+        while True:
+            line_start = file_handle.tell()
+            line = file_handle.readline()
+            if not line:
+                break
+            if not line.endswith("\n"):
+                # Partial line still being written by the API thread;
+                # rewind so the next poll re-reads it once complete
+                file_handle.seek(line_start)
+                break
+
             line = line.strip()
             if not line:
                 continue
@@ -242,7 +268,7 @@ class MapillaryDownloader:
         # Check if collection already exists on Internet Archive
         if self.check_ia and self.collection_name:
             logger.info(f"Checking if {self.collection_name} exists on Internet Archive...")
-            if check_ia_exists(requests.Session(), self.collection_name):
+            if check_ia_exists(collection_name=self.collection_name):
                 logger.info("Collection already exists on archive.org, skipping download")
                 return
 
@@ -295,20 +321,40 @@ class MapillaryDownloader:
                     """Fetch metadata from API and write to file (runs in thread)."""
                     try:
                         logger.debug("API fetch thread starting")
-                        with open(self.metadata_file, "a") as meta_f:
+                        with open(self.metadata_file, "a", buffering=1 << 20) as meta_f:
+
+                            def flush_and_save_cursor(next_url):
+                                """Make this page's metadata durable before advancing the cursor.
+
+                                A crash after the cursor write must not lose buffered
+                                lines - a resume would skip the page they came from.
+                                """
+                                meta_f.flush()
+                                save_cursor(next_url)
+
                             for image in self.client.get_user_images(
-                                self.username, self.quality, bbox=bbox, start_url=start_url, on_page=save_cursor
+                                self.username,
+                                self.quality,
+                                bbox=bbox,
+                                start_url=start_url,
+                                on_page=flush_and_save_cursor,
                             ):
                                 new_images_count[0] += 1
 
-                                # Save metadata (don't dedupe here, let the tailer handle it)
-                                meta_f.write(json.dumps(image) + "\n")
-                                meta_f.flush()
+                                # Save metadata (don't dedupe here, let the tailer handle it);
+                                # compact separators shave ~5% off every line
+                                meta_f.write(json.dumps(image, separators=(",", ":")) + "\n")
+
+                                # Flush periodically instead of per image; the tailer
+                                # copes with partial trailing lines in the meantime
+                                if new_images_count[0] % 256 == 0:
+                                    meta_f.flush()
 
                                 if new_images_count[0] % 1000 == 0:
                                     logger.info(f"API: fetched {new_images_count[0]:,} image URLs")
 
                             # Mark as complete and remove cursor
+                            meta_f.flush()
                             MetadataReader.mark_complete(self.metadata_file)
                             if self.cursor_file.exists():
                                 self.cursor_file.unlink()
@@ -341,7 +387,7 @@ class MapillaryDownloader:
                     image_id, bytes_dl, success, error_msg = result
 
                     if success:
-                        self.downloaded.add(image_id)
+                        self._mark_downloaded(image_id)
                         downloaded_count += 1
                         total_bytes += bytes_dl
 
@@ -402,7 +448,7 @@ class MapillaryDownloader:
                 completed += 1
 
                 if success:
-                    self.downloaded.add(image_id)
+                    self._mark_downloaded(image_id)
                     downloaded_count += 1
                     total_bytes += bytes_dl
 
@@ -437,12 +483,14 @@ class MapillaryDownloader:
         # If API fetch failed or nothing was downloaded, leave staging dir for retry
         if api_fetch_error[0] is not None:
             logger.error("API fetch failed, leaving staging dir for retry: %s", self.staging_dir)
+            self._progress_log_f.close()
             self.file_handler.close()
             logger.removeHandler(self.file_handler)
             raise api_fetch_error[0]
 
         if downloaded_count == 0 and not self.downloaded:
             logger.warning("No images downloaded, leaving staging dir for retry: %s", self.staging_dir)
+            self._progress_log_f.close()
             self.file_handler.close()
             logger.removeHandler(self.file_handler)
             return
@@ -463,7 +511,7 @@ class MapillaryDownloader:
 
                 with open(self.metadata_file, "rb") as f_in:
                     with gzip.open(gzipped_file, "wb", compresslevel=9) as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                        shutil.copyfileobj(f_in, f_out, length=1 << 20)
 
                 compressed_size = gzipped_file.stat().st_size
                 self.metadata_file.unlink()
@@ -477,7 +525,8 @@ class MapillaryDownloader:
         # Generate IA metadata
         generate_ia_metadata(self.output_dir)
 
-        # Close log file handler before moving directory
+        # Close log file handler and progress log before moving directory
+        self._progress_log_f.close()
         self.file_handler.close()
         logger.removeHandler(self.file_handler)
 
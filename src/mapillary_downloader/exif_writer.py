@@ -1,11 +1,33 @@
 """EXIF metadata writer for Mapillary images."""
 
+import io
 import logging
+import time
 import piexif
-from datetime import datetime
 
 logger = logging.getLogger("mapillary_downloader")
 
+# Tag IDs resolved once at import; write_exif_to_bytes runs per image and
+# the piexif.<IFD>.<Tag> attribute chains add up over large collections
+_MAKE = piexif.ImageIFD.Make
+_MODEL = piexif.ImageIFD.Model
+_IMAGE_WIDTH = piexif.ImageIFD.ImageWidth
+_IMAGE_LENGTH = piexif.ImageIFD.ImageLength
+_DATETIME = piexif.ImageIFD.DateTime
+_DATETIME_ORIGINAL = piexif.ExifIFD.DateTimeOriginal
+_DATETIME_DIGITIZED = piexif.ExifIFD.DateTimeDigitized
+_SUBSEC_ORIGINAL = piexif.ExifIFD.SubSecTimeOriginal
+_SUBSEC_DIGITIZED = piexif.ExifIFD.SubSecTimeDigitized
+_GPS_LATITUDE = piexif.GPSIFD.GPSLatitude
+_GPS_LATITUDE_REF = piexif.GPSIFD.GPSLatitudeRef
+_GPS_LONGITUDE = piexif.GPSIFD.GPSLongitude
+_GPS_LONGITUDE_REF = piexif.GPSIFD.GPSLongitudeRef
+_GPS_ALTITUDE = piexif.GPSIFD.GPSAltitude
+_GPS_ALTITUDE_REF = piexif.GPSIFD.GPSAltitudeRef
+_GPS_IMG_DIRECTION = piexif.GPSIFD.GPSImgDirection
+_GPS_IMG_DIRECTION_REF = piexif.GPSIFD.GPSImgDirectionRef
+_GPS_VERSION_ID = piexif.GPSIFD.GPSVersionID
+
 
 def decimal_to_dms(decimal):
     """Convert decimal degrees to degrees, minutes, seconds format for EXIF.
@@ -35,8 +57,9 @@ def timestamp_to_exif_datetime(timestamp):
     Returns:
         String in format "YYYY:MM:DD HH:MM:SS"
     """
-    dt = datetime.fromtimestamp(timestamp / 1000.0)
-    return dt.strftime("%Y:%m:%d %H:%M:%S")
+    # Fixed format, so skip strftime's per-call format parsing
+    t = time.localtime(timestamp / 1000.0)
+    return f"{t.tm_year:04d}:{t.tm_mon:02d}:{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
 
 
 def write_exif_to_image(image_path, metadata):
@@ -49,13 +72,39 @@ def write_exif_to_image(image_path, metadata):
     Returns:
         True if successful, False otherwise
     """
+    logger.debug(f"Writing EXIF to {image_path}")
+    try:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+    except OSError as e:
+        logger.warning(f"Failed to write EXIF data to {image_path}: {e}")
+        return False
+
+    new_bytes = write_exif_to_bytes(image_bytes, metadata)
+    if new_bytes is None:
+        return False
+
+    with open(image_path, "wb") as f:
+        f.write(new_bytes)
+    return True
+
+
+def write_exif_to_bytes(image_bytes, metadata):
+    """Write EXIF metadata from Mapillary API into in-memory JPEG data.
+
+    Args:
+        image_bytes: JPEG file contents
+        metadata: Dictionary of metadata from Mapillary API
+
+    Returns:
+        New JPEG bytes with EXIF inserted, or None on failure
+    """
     try:
-        logger.debug(f"Writing EXIF to {image_path}")
         logger.debug(f"Metadata: {metadata}")
 
         # Load existing EXIF data if any
         try:
-            exif_dict = piexif.load(str(image_path))
+            exif_dict = piexif.load(image_bytes)
         except Exception:
             # No existing EXIF data, start fresh
             exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
@@ -67,26 +116,26 @@ def write_exif_to_image(image_path, metadata):
 
         # Basic image info (0th IFD)
         if "make" in metadata and metadata["make"]:
-            exif_dict["0th"][piexif.ImageIFD.Make] = metadata["make"].encode("utf-8")
+            exif_dict["0th"][_MAKE] = metadata["make"].encode("utf-8")
 
         if "model" in metadata and metadata["model"]:
-            exif_dict["0th"][piexif.ImageIFD.Model] = metadata["model"].encode("utf-8")
+            exif_dict["0th"][_MODEL] = metadata["model"].encode("utf-8")
 
         if "width" in metadata and metadata["width"]:
-            exif_dict["0th"][piexif.ImageIFD.ImageWidth] = metadata["width"]
+            exif_dict["0th"][_IMAGE_WIDTH] = metadata["width"]
 
         if "height" in metadata and metadata["height"]:
-            exif_dict["0th"][piexif.ImageIFD.ImageLength] = metadata["height"]
+            exif_dict["0th"][_IMAGE_LENGTH] = metadata["height"]
 
         # Datetime tags
         if "captured_at" in metadata and metadata["captured_at"]:
             datetime_str = timestamp_to_exif_datetime(metadata["captured_at"])
             datetime_bytes = datetime_str.encode("utf-8")
-            exif_dict["0th"][piexif.ImageIFD.DateTime] = datetime_bytes
-            exif_dict["Exif"][piexif.ExifIFD.DateTimeOriginal] = datetime_bytes
-            exif_dict["Exif"][piexif.ExifIFD.DateTimeDigitized] = datetime_bytes
-            exif_dict["Exif"][piexif.ExifIFD.SubSecTimeOriginal] = ("000" + str(metadata["captured_at"] % 1000))[-3:]
-            exif_dict["Exif"][piexif.ExifIFD.SubSecTimeDigitized] = ("000" + str(metadata["captured_at"] % 1000))[-3:]
+            exif_dict["0th"][_DATETIME] = datetime_bytes
+            exif_dict["Exif"][_DATETIME_ORIGINAL] = datetime_bytes
+            exif_dict["Exif"][_DATETIME_DIGITIZED] = datetime_bytes
+            exif_dict["Exif"][_SUBSEC_ORIGINAL] = ("000" + str(metadata["captured_at"] % 1000))[-3:]
+            exif_dict["Exif"][_SUBSEC_DIGITIZED] = ("000" + str(metadata["captured_at"] % 1000))[-3:]
 
         # GPS data - prefer computed_geometry over geometry
         geometry = metadata.get("computed_geometry") or metadata.get("geometry")
@@ -94,12 +143,12 @@ def write_exif_to_image(image_path, metadata):
             lon, lat = geometry["coordinates"]
 
             # GPS Latitude
-            exif_dict["GPS"][piexif.GPSIFD.GPSLatitude] = decimal_to_dms(lat)
-            exif_dict["GPS"][piexif.GPSIFD.GPSLatitudeRef] = b"N" if lat >= 0 else b"S"
+            exif_dict["GPS"][_GPS_LATITUDE] = decimal_to_dms(lat)
+            exif_dict["GPS"][_GPS_LATITUDE_REF] = b"N" if lat >= 0 else b"S"
 
             # GPS Longitude
-            exif_dict["GPS"][piexif.GPSIFD.GPSLongitude] = decimal_to_dms(lon)
-            exif_dict["GPS"][piexif.GPSIFD.GPSLongitudeRef] = b"E" if lon >= 0 else b"W"
+            exif_dict["GPS"][_GPS_LONGITUDE] = decimal_to_dms(lon)
+            exif_dict["GPS"][_GPS_LONGITUDE_REF] = b"E" if lon >= 0 else b"W"
 
         # GPS Altitude - prefer raw altitude (photogrammetry can't compute elevation)
         altitude = metadata.get("altitude") or metadata.get("computed_altitude")
@@ -110,28 +159,29 @@ def write_exif_to_image(image_path, metadata):
             if altitude is not None and abs(altitude) <= 100000:
                 altitude_val = int(abs(altitude) * 100)
                 logger.debug(f"Raw altitude value: {altitude}, calculated: {altitude_val}")
-                exif_dict["GPS"][piexif.GPSIFD.GPSAltitude] = (altitude_val, 100)
-                exif_dict["GPS"][piexif.GPSIFD.GPSAltitudeRef] = 1 if altitude < 0 else 0
+                exif_dict["GPS"][_GPS_ALTITUDE] = (altitude_val, 100)
+                exif_dict["GPS"][_GPS_ALTITUDE_REF] = 1 if altitude < 0 else 0
 
         # GPS Compass direction
         compass = metadata.get("computed_compass_angle") or metadata.get("compass_angle")
         if compass is not None:
             # Normalize compass to 0-360 range
             compass_val = int((compass % 360) * 100)
-            exif_dict["GPS"][piexif.GPSIFD.GPSImgDirection] = (compass_val, 100)
-            exif_dict["GPS"][piexif.GPSIFD.GPSImgDirectionRef] = b"T"  # True north
+            exif_dict["GPS"][_GPS_IMG_DIRECTION] = (compass_val, 100)
+            exif_dict["GPS"][_GPS_IMG_DIRECTION_REF] = b"T"  # True north
 
         # GPS Version
-        exif_dict["GPS"][piexif.GPSIFD.GPSVersionID] = (2, 0, 0, 0)
+        exif_dict["GPS"][_GPS_VERSION_ID] = (2, 0, 0, 0)
 
-        # Dump and write EXIF data
+        # Dump and splice EXIF into the JPEG in memory
         exif_bytes = piexif.dump(exif_dict)
-        piexif.insert(exif_bytes, str(image_path))
+        output = io.BytesIO()
+        piexif.insert(exif_bytes, image_bytes, output)
 
-        logger.debug(f"Successfully wrote EXIF to {image_path}")
-        return True
+        logger.debug(f"Successfully wrote EXIF for image {metadata.get('id')}")
+        return output.getvalue()
 
     except Exception as e:
-        logger.warning(f"Failed to write EXIF data to {image_path}: {e}")
+        logger.warning(f"Failed to write EXIF data for image {metadata.get('id')}: {e}")
         logger.debug(f"Full metadata: {metadata}")
-        return False
+        return None
@@ -3,19 +3,78 @@
 import logging
 import requests
 
+from mapillary_downloader.utils import get_cache_dir
+
 logger = logging.getLogger("mapillary_downloader")
 
+# Collection names confirmed to exist on IA, seeded from the persisted
+# cache file on first use (existence is permanent, so hits never expire)
+_known_collections = None
+
+# Shared session for IA checks, created on first use so callers that
+# never hit the network never pay for it
+_session = None
+
+
+def _get_session():
+    """Return the lazily created shared session for IA requests."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def _cache_file():
+    """Path to the persisted cache of known-existing collections."""
+    return get_cache_dir() / "ia_seen.txt"
+
+
+def _load_known_collections():
+    """Load (and lazily seed) the in-memory cache of known collections."""
+    global _known_collections
+    if _known_collections is None:
+        _known_collections = set()
+        cache_file = _cache_file()
+        if cache_file.exists():
+            with open(cache_file) as f:
+                _known_collections.update(line.strip() for line in f if line.strip())
+    return _known_collections
 
-def check_ia_exists(session, collection_name):
+
+def _remember_collection(collection_name):
+    """Persist a collection name known to exist on IA."""
+    known = _load_known_collections()
+    if collection_name in known:
+        return
+    known.add(collection_name)
+    try:
+        with open(_cache_file(), "a") as f:
+            f.write(collection_name + "\n")
+    except OSError as e:
+        logger.debug(f"Failed to persist IA cache entry for {collection_name}: {e}")
+
+
+def check_ia_exists(session=None, collection_name=None):
     """Check if a collection exists on Internet Archive.
 
+    Positive results are cached in memory and on disk, so repeated runs
+    skip the HTTP round-trip for collections already confirmed present.
+
     Args:
-        session: requests.Session for connection pooling
+        session: Optional requests.Session; a shared module-level session
+            is used when omitted so TLS connections are reused
         collection_name: Name of the collection (e.g., mapillary-username-original-webp)
 
     Returns:
         Boolean indicating if the collection exists on IA
     """
+    if collection_name in _load_known_collections():
+        logger.debug(f"IA existence cached for {collection_name}")
+        return True
+
+    if session is None:
+        session = _get_session()
+
     ia_url = f"https://archive.org/metadata/{collection_name}"
 
     try:
@@ -25,6 +84,7 @@ def check_ia_exists(session, collection_name):
             data = response.json()
             # Check if it's a valid item (not just metadata for non-existent item)
             if "metadata" in data and data.get("is_dark") is not True:
+                _remember_collection(collection_name)
                 return True
         return False
     except requests.RequestException as e:
@@ -27,6 +27,8 @@ class ColoredFormatter(logging.Formatter):
         """
         super().__init__(fmt, datefmt)
         self.use_color = use_color and sys.stdout.isatty()
+        # Colored level names built once; format() runs per record
+        self._colored_levels = {name: f"{color}{name}{self.COLORS['RESET']}" for name, color in self.COLORS.items()}
 
     def format(self, record):
         """Format the log record with colors if appropriate.
@@ -38,9 +40,9 @@ class ColoredFormatter(logging.Formatter):
             Formatted log string
         """
         if self.use_color:
-            levelname = record.levelname
-            if levelname in self.COLORS:
-                record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
+            colored = self._colored_levels.get(record.levelname)
+            if colored:
+                record.levelname = colored
 
             # Color API messages differently so they stand out
             if record.msg.startswith("API"):
@@ -25,6 +25,9 @@ class MetadataReader:
         self.metadata_file = Path(metadata_file)
         self.is_complete = self._check_complete()
 
+    # How much of the end of the file to inspect for the marker
+    TAIL_BYTES = 65536
+
     def _check_complete(self):
         """Check if metadata file has completion marker.
 
@@ -34,32 +37,34 @@ class MetadataReader:
         if not self.metadata_file.exists():
             return False
 
-        # Check last few lines for completion marker (it should be at the end)
+        # The marker is appended near the end, so only the tail matters
         try:
             if self.metadata_file.suffix == ".gz":
-                file_handle = gzip.open(self.metadata_file, "rt")
+                # gzip has no random access; stream and keep the last lines
+                with gzip.open(self.metadata_file, "rt") as f:
+                    lines = []
+                    for line in f:
+                        lines.append(line.encode())
+                        if len(lines) > 10:
+                            lines.pop(0)
             else:
-                file_handle = open(self.metadata_file)
-
-            with file_handle as f:
-                # Read last 10 lines to find completion marker
-                lines = []
-                for line in f:
-                    lines.append(line)
-                    if len(lines) > 10:
-                        lines.pop(0)
-
-                # Check if any of the last lines is the completion marker
-                for line in reversed(lines):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                        if data.get("__complete__"):
-                            return True
-                    except json.JSONDecodeError:
-                        continue
+                # Plain file: read just the last chunk instead of scanning
+                # the whole multi-GB dump from the start
+                with open(self.metadata_file, "rb") as f:
+                    f.seek(0, 2)
+                    size = f.tell()
+                    f.seek(max(0, size - self.TAIL_BYTES))
+                    lines = f.read().splitlines()
+
+            for line in reversed(lines):
+                if b'"__complete__"' not in line:
+                    continue
+                try:
+                    data = json.loads(line)
+                    if data.get("__complete__"):
+                        return True
+                except json.JSONDecodeError:
+                    continue
 
             return False
         except Exception:
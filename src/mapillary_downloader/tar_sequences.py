@@ -2,15 +2,20 @@
 
 import functools
 import logging
+import os
 import re
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from mapillary_downloader.utils import format_size
 
 logger = logging.getLogger("mapillary_downloader")
 
+# Date directories are named YYYY-MM-DD, plus the fallback bucket
+DATE_DIR_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+
 
 @functools.cache
 def _is_gnu_tar():
@@ -43,8 +48,16 @@ def tar_date_directory(collection_dir, date_dir):
             addendum += 1
         logger.info(f"Existing tar for {date_name}, creating addendum: {tar_path.name}")
 
-    # Build sorted file list relative to collection_dir
-    files = sorted(str(f.relative_to(collection_dir)) for f in date_dir.rglob("*") if f.is_file())
+    # Build sorted file list relative to collection_dir in one os.walk pass
+    # (rglob + is_file() stats every entry twice). The explicit list, rather
+    # than tar's own recursion, keeps directory entries out of the archive so
+    # output stays reproducible regardless of directory mtimes.
+    files = []
+    for root, _dirs, names in os.walk(date_dir):
+        rel_root = os.path.relpath(root, collection_dir)
+        for name in names:
+            files.append(os.path.join(rel_root, name))
+    files.sort()
     if not files:
         logger.warning(f"Skipping empty date directory: {date_name}")
         return None, 0
@@ -103,10 +116,12 @@ def tar_sequence_directories(collection_dir):
     skip_dirs = {".meta", "__pycache__"}
     date_dirs = []
 
-    for item in collection_dir.iterdir():
-        if item.is_dir() and item.name not in skip_dirs:
-            if re.match(r"\d{4}-\d{2}-\d{2}$", item.name) or item.name == "unknown-date":
-                date_dirs.append(item)
+    # scandir exposes the dirent type directly, avoiding a stat per entry
+    with os.scandir(collection_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name not in skip_dirs:
+                if DATE_DIR_RE.match(entry.name) or entry.name == "unknown-date":
+                    date_dirs.append(Path(entry.path))
 
     if not date_dirs:
         logger.info("No date directories to tar")
@@ -120,14 +135,18 @@ def tar_sequence_directories(collection_dir):
     total_files = 0
     total_tar_bytes = 0
 
-    for date_dir in date_dirs:
-        tar_path, file_count = tar_date_directory(collection_dir, date_dir)
-        if tar_path:
-            tar_size = tar_path.stat().st_size
-            total_tar_bytes += tar_size
-            tarred_count += 1
-            total_files += file_count
-            logger.info(f"Tarred date '{date_dir.name}': {file_count:,} files, {format_size(tar_size)}")
+    # Date directories are independent, so tar them in parallel (each call
+    # blocks on its own tar subprocess, so threads are enough)
+    max_workers = min(os.cpu_count() or 1, len(date_dirs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda d: (d, *tar_date_directory(collection_dir, d)), date_dirs)
+        for date_dir, tar_path, file_count in results:
+            if tar_path:
+                tar_size = tar_path.stat().st_size
+                total_tar_bytes += tar_size
+                tarred_count += 1
+                total_files += file_count
+                logger.info(f"Tarred date '{date_dir.name}': {file_count:,} files, {format_size(tar_size)}")
 
     logger.info(f"Tarred {tarred_count} dates ({total_files:,} files, {format_size(total_tar_bytes)} total tar size)")
     return tarred_count, total_files
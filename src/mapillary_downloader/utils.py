@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import random
 import time
 from pathlib import Path
 from requests.exceptions import RequestException
@@ -54,19 +55,15 @@ def format_time(seconds):
     Returns:
         Formatted string (e.g. "2h 15m", "45m 30s", "30s")
     """
-    if seconds < 60:
-        return f"{int(seconds)}s"
+    minutes, remaining_seconds = divmod(int(seconds), 60)
+    if minutes == 0:
+        return f"{remaining_seconds}s"
 
-    minutes = int(seconds / 60)
-    remaining_seconds = int(seconds % 60)
-
-    if minutes < 60:
+    hours, remaining_minutes = divmod(minutes, 60)
+    if hours == 0:
         if remaining_seconds > 0:
-            return f"{minutes}m {remaining_seconds}s"
-        return f"{minutes}m"
-
-    hours = int(minutes / 60)
-    remaining_minutes = minutes % 60
+            return f"{remaining_minutes}m {remaining_seconds}s"
+        return f"{remaining_minutes}m"
 
     if remaining_minutes > 0:
         return f"{hours}h {remaining_minutes}m"
@@ -93,8 +90,31 @@ def safe_json_save(file_path, data):
     temp_file.replace(file_path)
 
 
-def http_get_with_retry(session, url, params=None, max_retries=5, base_delay=1.0, timeout=60):
-    """HTTP GET with exponential backoff retry.
+def _retry_after_seconds(response):
+    """Parse a Retry-After header from a response, if present.
+
+    Args:
+        response: requests.Response or None
+
+    Returns:
+        Delay in seconds as float, or None if unavailable/unparseable
+    """
+    if response is None:
+        return None
+    try:
+        value = response.headers.get("Retry-After")
+        return float(value)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def http_get_with_retry(
+    session, url, params=None, max_retries=5, base_delay=1.0, max_delay=60.0, timeout=60, stream=False
+):
+    """HTTP GET with decorrelated-jitter backoff retry.
+
+    Randomized delays keep parallel workers from retrying in lockstep,
+    and a server-supplied Retry-After header is honored when present.
 
     Args:
         session: requests.Session for connection pooling
@@ -102,7 +122,9 @@ def http_get_with_retry(session, url, params=None, max_retries=5, base_delay=1.0
         params: Optional query parameters
         max_retries: Maximum retry attempts (default: 5)
         base_delay: Initial delay in seconds (default: 1.0)
+        max_delay: Upper bound on any single delay in seconds (default: 60.0)
         timeout: Request timeout in seconds (default: 60)
+        stream: Whether to defer body download to the caller (default: False)
 
     Returns:
         requests.Response object
@@ -110,16 +132,24 @@ def http_get_with_retry(session, url, params=None, max_retries=5, base_delay=1.0
     Raises:
         requests.RequestException: If all retries exhausted
     """
+    delay = base_delay
     for attempt in range(max_retries):
         try:
-            response = session.get(url, params=params, timeout=timeout)
+            response = session.get(url, params=params, timeout=timeout, stream=stream)
             response.raise_for_status()
             return response
         except RequestException as e:
             if attempt == max_retries - 1:
                 raise
 
-            delay = base_delay * (2**attempt)
+            # Decorrelated jitter (AWS style): uniform between base and 3x previous
+            delay = min(max_delay, random.uniform(base_delay, delay * 3))
+
+            # If the server told us when to come back, believe it
+            retry_after = _retry_after_seconds(getattr(e, "response", None))
+            if retry_after is not None:
+                delay = min(max(delay, retry_after), max_delay)
+
             logger.warning(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
             logger.info(f"Retrying in {delay:.1f} seconds...")
             time.sleep(delay)
@@ -1,25 +1,29 @@
 """WebP image conversion utilities."""
 
+import io
 import logging
-import shutil
-import subprocess
 from pathlib import Path
 
+from PIL import Image, features
+
 logger = logging.getLogger("mapillary_downloader")
 
 
-def check_cwebp_available():
-    """Check if cwebp binary is available.
+def check_webp_available():
+    """Check if Pillow was built with WebP support.
 
     Returns:
-        bool: True if cwebp is found, False otherwise
+        bool: True if WebP encoding is available, False otherwise
     """
-    return shutil.which("cwebp") is not None
+    return bool(features.check("webp"))
 
 
 def convert_to_webp(jpg_path, output_path, delete_original=True):
     """Convert a JPG image to WebP format, preserving EXIF metadata.
 
+    Encodes in-process with Pillow's libwebp binding, carrying EXIF, XMP
+    and ICC profile data through (matching cwebp's -metadata all).
+
     Args:
         jpg_path: Path to the JPG file
         output_path: Path for the WebP output
@@ -33,16 +37,11 @@ def convert_to_webp(jpg_path, output_path, delete_original=True):
     webp_path.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        # Convert with cwebp, preserving all metadata
-        result = subprocess.run(
-            ["cwebp", "-metadata", "all", str(jpg_path), "-o", str(webp_path)],
-            capture_output=True,
-            text=True,
-        )
-
-        if result.returncode != 0:
-            logger.error(f"cwebp conversion failed for {jpg_path}: {result.stderr}")
+        webp_bytes = convert_bytes_to_webp(jpg_path.read_bytes())
+        if webp_bytes is None:
+            logger.error(f"Error converting {jpg_path} to WebP")
             return None
+        webp_path.write_bytes(webp_bytes)
 
         # Delete original JPG after successful conversion if requested
         if delete_original:
@@ -52,3 +51,29 @@ def convert_to_webp(jpg_path, output_path, delete_original=True):
     except Exception as e:
         logger.error(f"Error converting {jpg_path} to WebP: {e}")
         return None
+
+
+def convert_bytes_to_webp(jpg_bytes):
+    """Convert in-memory JPEG data to WebP, preserving metadata.
+
+    Args:
+        jpg_bytes: JPEG file contents
+
+    Returns:
+        WebP file contents as bytes, or None if conversion failed
+    """
+    try:
+        with Image.open(io.BytesIO(jpg_bytes)) as img:
+            # Same defaults as cwebp: quality 75, method 4
+            save_kwargs = {"quality": 75, "method": 4}
+            for key in ("exif", "xmp", "icc_profile"):
+                value = img.info.get(key)
+                if value:
+                    save_kwargs[key] = value
+            output = io.BytesIO()
+            img.save(output, "WEBP", **save_kwargs)
+        return output.getvalue()
+
+    except Exception as e:
+        logger.debug(f"WebP conversion failed: {e}")
+        return None
@@ -1,17 +1,22 @@
 """Worker process for parallel image download and conversion."""
 
 import os
-import shutil
 import signal
-import tempfile
 from datetime import datetime
-from pathlib import Path
 import requests
-from mapillary_downloader.exif_writer import write_exif_to_image
-from mapillary_downloader.xmp_writer import write_xmp_to_image
-from mapillary_downloader.webp_converter import convert_to_webp
+from requests.adapters import HTTPAdapter
+from mapillary_downloader.exif_writer import write_exif_to_bytes
+from mapillary_downloader.xmp_writer import write_xmp_to_bytes
+from mapillary_downloader.webp_converter import convert_bytes_to_webp
 from mapillary_downloader.utils import http_get_with_retry
 
+# Directories this process has already created; date/sequence dirs are
+# never removed mid-run, so skip the stat+mkdir syscalls on repeat images
+_created_dirs = set()
+
+# Quality -> metadata field name, built once instead of per image
+_QUALITY_FIELDS = {q: f"thumb_{q}_url" for q in ("256", "1024", "2048", "original")}
+
 
 def worker_process(work_queue, result_queue, worker_id):
     """Worker process that pulls from queue and processes images.
@@ -26,6 +31,11 @@ def worker_process(work_queue, result_queue, worker_id):
 
     # Create session once per worker (reuse HTTP connections)
     session = requests.Session()
+    # Keep enough pooled connections alive to avoid TCP+TLS handshakes per image
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    current_token = None
 
     while True:
         work_item = work_queue.get()
@@ -37,8 +47,10 @@ def worker_process(work_queue, result_queue, worker_id):
         # Unpack work item
         image_data, output_dir, quality, convert_webp, access_token = work_item
 
-        # Update session auth for this request
-        session.headers.update({"Authorization": f"OAuth {access_token}"})
+        # Update session auth only when the token changes
+        if access_token != current_token:
+            session.headers.update({"Authorization": f"OAuth {access_token}"})
+            current_token = access_token
 
         # Process the image
         result = download_and_convert_image(image_data, output_dir, quality, convert_webp, session)
@@ -50,7 +62,9 @@ def worker_process(work_queue, result_queue, worker_id):
 def download_and_convert_image(image_data, output_dir, quality, convert_webp, session):
     """Download and optionally convert a single image.
 
-    This function is designed to run in a worker process.
+    The whole pipeline runs in memory: download to bytes, splice in EXIF
+    and XMP, encode WebP, then write the final file once. This function
+    is designed to run in a worker process.
 
     Args:
         image_data: Image metadata dict from API
@@ -63,9 +77,8 @@ def download_and_convert_image(image_data, output_dir, quality, convert_webp, se
         Tuple of (image_id, bytes_downloaded, success, error_msg)
     """
     image_id = image_data["id"]
-    quality_field = f"thumb_{quality}_url"
+    quality_field = _QUALITY_FIELDS.get(quality) or f"thumb_{quality}_url"
 
-    temp_dir = None
     try:
         # Get image URL
         image_url = image_data.get(quality_field)
@@ -73,7 +86,6 @@ def download_and_convert_image(image_data, output_dir, quality, convert_webp, se
             return (image_id, 0, False, f"No {quality} URL")
 
         # Determine final output directory - organize by capture date
-        output_dir = Path(output_dir)
         sequence_id = image_data.get("sequence")
 
         # Extract date from captured_at timestamp (milliseconds since epoch)
@@ -85,48 +97,51 @@ def download_and_convert_image(image_data, output_dir, quality, convert_webp, se
             # Fallback for missing timestamp (should be rare per API docs)
             date_str = "unknown-date"
 
+        # Plain-string paths: this runs per image, and Path division plus
+        # str() conversions allocate several objects each time
         if sequence_id:
-            img_dir = output_dir / date_str / sequence_id
-            img_dir.mkdir(parents=True, exist_ok=True)
-        else:
-            img_dir = output_dir / date_str
-            img_dir.mkdir(parents=True, exist_ok=True)
-
-        # If converting to WebP, use /tmp for intermediate JPEG
-        # Otherwise write JPEG directly to final location
-        if convert_webp:
-            temp_dir = tempfile.mkdtemp(prefix="mapillary_downloader_")
-            jpg_path = Path(temp_dir) / f"{image_id}.jpg"
-            final_path = img_dir / f"{image_id}.webp"
+            img_dir = os.path.join(output_dir, date_str, sequence_id)
         else:
-            jpg_path = img_dir / f"{image_id}.jpg"
-            final_path = jpg_path
+            img_dir = os.path.join(output_dir, date_str)
+        if img_dir not in _created_dirs:
+            os.makedirs(img_dir, exist_ok=True)
+            _created_dirs.add(img_dir)
 
-        # Download image with retry logic
-        bytes_downloaded = 0
+        ext = ".webp" if convert_webp else ".jpg"
+        final_path = os.path.join(img_dir, f"{image_id}{ext}")
 
+        # Download image into memory with retry logic
         try:
-            # Use retry logic with 3 attempts for image downloads
-            response = http_get_with_retry(session, image_url, max_retries=3, base_delay=1.0, timeout=60)
-
-            with open(jpg_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    bytes_downloaded += len(chunk)
+            # Use retry logic with 3 attempts for image downloads; read the
+            # body in one raw read instead of requests' 10KB iter_content loop
+            response = http_get_with_retry(session, image_url, max_retries=3, base_delay=1.0, timeout=60, stream=True)
+            response.raw.decode_content = True
+            data = response.raw.read()
         except Exception as e:
             return (image_id, 0, False, f"Download failed: {e}")
 
+        bytes_downloaded = len(data)
+
         # Write EXIF metadata
-        write_exif_to_image(jpg_path, image_data)
+        exif_data = write_exif_to_bytes(data, image_data)
+        if exif_data is not None:
+            data = exif_data
 
         # Write XMP metadata for panoramas
-        write_xmp_to_image(jpg_path, image_data)
+        xmp_data = write_xmp_to_bytes(data, image_data)
+        if xmp_data is not None:
+            data = xmp_data
 
         # Convert to WebP if requested
         if convert_webp:
-            webp_path = convert_to_webp(jpg_path, output_path=final_path, delete_original=False)
-            if not webp_path:
+            webp_data = convert_bytes_to_webp(data)
+            if webp_data is None:
                 return (image_id, bytes_downloaded, False, "WebP conversion failed")
+            data = webp_data
+
+        # Single write of the finished file
+        with open(final_path, "wb") as f:
+            f.write(data)
 
         # Set file mtime to captured_at timestamp for reproducibility
         if "captured_at" in image_data:
@@ -138,6 +153,3 @@ def download_and_convert_image(image_data, output_dir, quality, convert_webp, se
 
     except Exception as e:
         return (image_id, 0, False, str(e))
-    finally:
-        if temp_dir:
-            shutil.rmtree(temp_dir, ignore_errors=True)
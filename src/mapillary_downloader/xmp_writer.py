@@ -66,24 +66,50 @@ def write_xmp_to_image(image_path, metadata):
     Returns:
         True if XMP was written, False if skipped or failed
     """
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning(f"Failed to write XMP to {image_path}: {e}")
+        return False
+
+    new_data = write_xmp_to_bytes(data, metadata)
+    if new_data is None:
+        return False
+
+    with open(image_path, "wb") as f:
+        f.write(new_data)
+    return True
+
+
+def write_xmp_to_bytes(data, metadata):
+    """Write XMP GPano metadata into in-memory JPEG data for panoramas.
+
+    Only writes metadata if is_pano is True in the metadata dict.
+
+    Args:
+        data: JPEG file contents
+        metadata: Dictionary of metadata from Mapillary API
+
+    Returns:
+        New JPEG bytes with XMP inserted, or None if skipped or failed
+    """
+    image_id = metadata.get("id")
+
     # Only write XMP for panoramas
     if not metadata.get("is_pano"):
-        return False
+        return None
 
     # Need dimensions to write meaningful GPano data
     if not metadata.get("width") or not metadata.get("height"):
-        logger.warning(f"Skipping XMP for {image_path}: missing dimensions")
-        return False
+        logger.warning(f"Skipping XMP for image {image_id}: missing dimensions")
+        return None
 
     try:
-        # Read the JPEG file
-        with open(image_path, "rb") as f:
-            data = f.read()
-
         # Verify JPEG signature
         if data[:2] != b"\xff\xd8":
-            logger.warning(f"Skipping XMP for {image_path}: not a valid JPEG")
-            return False
+            logger.warning(f"Skipping XMP for image {image_id}: not a valid JPEG")
+            return None
 
         # Build XMP packet
         xmp_xml = build_xmp_packet(metadata)
@@ -94,8 +120,8 @@ def write_xmp_to_image(image_path, metadata):
         segment_length = len(xmp_segment) + 2  # +2 for length bytes
 
         if segment_length > 65535:
-            logger.warning(f"Skipping XMP for {image_path}: XMP too large")
-            return False
+            logger.warning(f"Skipping XMP for image {image_id}: XMP too large")
+            return None
 
         # APP1 marker (0xFFE1) + length + data
         app1_marker = b"\xff\xe1"
@@ -122,11 +148,8 @@ def write_xmp_to_image(image_path, metadata):
                 seg_data = data[pos + 4 : pos + 2 + seg_len]
                 if seg_data.startswith(XMP_NAMESPACE):
                     # XMP already exists, replace it
-                    new_data = data[:pos] + full_segment + data[pos + 2 + seg_len :]
-                    with open(image_path, "wb") as f:
-                        f.write(new_data)
-                    logger.debug(f"Replaced XMP in {image_path}")
-                    return True
+                    logger.debug(f"Replaced XMP in image {image_id}")
+                    return data[:pos] + full_segment + data[pos + 2 + seg_len :]
                 # Skip this APP1 (probably EXIF)
                 pos += 2 + seg_len
                 continue
@@ -141,14 +164,9 @@ def write_xmp_to_image(image_path, metadata):
             break
 
         # Insert XMP segment at current position
-        new_data = data[:pos] + full_segment + data[pos:]
-
-        with open(image_path, "wb") as f:
-            f.write(new_data)
-
-        logger.debug(f"Wrote XMP GPano metadata to {image_path}")
-        return True
+        logger.debug(f"Wrote XMP GPano metadata for image {image_id}")
+        return data[:pos] + full_segment + data[pos:]
 
     except Exception as e:
-        logger.warning(f"Failed to write XMP to {image_path}: {e}")
-        return False
+        logger.warning(f"Failed to write XMP for image {image_id}: {e}")
+        return None
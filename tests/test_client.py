@@ -1,7 +1,8 @@
 """Tests for the Mapillary API client."""
 
+import time
 from unittest.mock import Mock
-from mapillary_downloader.client import MapillaryClient
+from mapillary_downloader.client import MapillaryClient, _pagination_delay
 
 
 def test_client_init():
@@ -80,3 +81,30 @@ def test_get_user_images_with_bbox():
     call_args = client.session.get.call_args
     assert "bbox" in call_args[1]["params"]
     assert call_args[1]["params"]["bbox"] == "-180,-90,180,90"
+
+
+def test_pagination_delay_headroom():
+    """Test that plenty of rate-limit headroom means no sleep."""
+    response = Mock()
+    response.headers = {"X-RateLimit-Remaining": "9500"}
+
+    assert _pagination_delay(response) == 0
+
+
+def test_pagination_delay_low_headroom():
+    """Test that a nearly exhausted budget produces a real delay."""
+    response = Mock()
+    response.headers = {
+        "X-RateLimit-Remaining": "10",
+        "X-RateLimit-Reset": str(time.time() + 30),
+    }
+
+    assert _pagination_delay(response) >= 1.0
+
+
+def test_pagination_delay_missing_headers():
+    """Test fallback to the flat courtesy sleep without headers."""
+    response = Mock()
+    response.headers = {}
+
+    assert _pagination_delay(response) == 0.01
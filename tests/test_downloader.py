@@ -70,11 +70,11 @@ def test_load_progress_empty(tmp_path):
 
 
 def test_load_progress_existing(tmp_path):
-    """Test loading progress from existing file."""
+    """Test loading progress from an existing log."""
     staging_dir = tmp_path / "mapillary-testuser-original"
     staging_dir.mkdir()
-    progress_file = staging_dir / "progress.json"
-    progress_file.write_text(json.dumps({"original": ["img1", "img2"], "1024": ["other"]}))
+    progress_log = staging_dir / "downloaded.original.log"
+    progress_log.write_text("img1\nimg2\n")
 
     mock_client = Mock()
     with patch("mapillary_downloader.downloader.get_cache_dir", return_value=tmp_path):
@@ -85,23 +85,37 @@ def test_load_progress_existing(tmp_path):
         assert "img2" in downloader.downloaded
 
 
+def test_load_progress_migrates_legacy_json(tmp_path):
+    """Test migrating progress from the legacy per-quality JSON format."""
+    staging_dir = tmp_path / "mapillary-testuser-original"
+    staging_dir.mkdir()
+    progress_file = staging_dir / "progress.json"
+    progress_file.write_text(json.dumps({"original": ["img1", "img2"], "1024": ["other"]}))
+
+    mock_client = Mock()
+    with patch("mapillary_downloader.downloader.get_cache_dir", return_value=tmp_path):
+        downloader = MapillaryDownloader(mock_client, tmp_path, username="testuser", quality="original")
+
+        assert downloader.downloaded == {"img1", "img2"}
+
+        # Migration writes the ids into the append-only log
+        log_lines = set((staging_dir / "downloaded.original.log").read_text().splitlines())
+        assert log_lines == {"img1", "img2"}
+
+
 def test_save_progress(tmp_path):
-    """Test saving progress."""
+    """Test that downloaded IDs are appended to the progress log."""
     mock_client = Mock()
     with patch("mapillary_downloader.downloader.get_cache_dir", return_value=tmp_path):
         downloader = MapillaryDownloader(mock_client, tmp_path, username="testuser", quality="original")
 
-        downloader.downloaded.add("img1")
-        downloader.downloaded.add("img2")
+        downloader._mark_downloaded("img1")
+        downloader._mark_downloaded("img2")
         downloader._save_progress()
 
-        progress_file = downloader.staging_dir / "progress.json"
-        assert progress_file.exists()
-
-        data = json.loads(progress_file.read_text())
-        # New format is per-quality: {"original": [...], "1024": [...]}
-        assert len(data["original"]) == 2
-        assert "img1" in data["original"]
+        progress_log = downloader.staging_dir / "downloaded.original.log"
+        assert progress_log.exists()
+        assert progress_log.read_text() == "img1\nimg2\n"
 
 
 def test_download_user_data_submits_metadata_to_worker_pool(tmp_path):
@@ -1,9 +1,21 @@
 """Tests for Internet Archive check."""
 
+import pytest
 from requests.exceptions import RequestException
+from unittest.mock import patch
+from mapillary_downloader import ia_check
 from mapillary_downloader.ia_check import check_ia_exists
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path):
+    """Point the persisted IA cache at a temp dir and reset the memo."""
+    with patch("mapillary_downloader.ia_check.get_cache_dir", return_value=tmp_path):
+        ia_check._known_collections = None
+        yield tmp_path
+        ia_check._known_collections = None
+
+
 class FakeResponse:
     """Fake response object for testing."""
 
@@ -74,3 +86,39 @@ def test_check_ia_exists_network_error():
     result = check_ia_exists(session, "mapillary-testuser-original")
 
     assert result is False
+
+
+def test_check_ia_exists_caches_positive_result(isolated_cache):
+    """Test that a confirmed collection is not probed again."""
+    session = FakeSession(FakeResponse(200, {"metadata": {"title": "test"}}))
+
+    assert check_ia_exists(session, "mapillary-testuser-original") is True
+    assert check_ia_exists(session, "mapillary-testuser-original") is True
+
+    # Only the first call hits the network
+    assert len(session.calls) == 1
+
+    # Positive result is persisted for future runs
+    cache_file = isolated_cache / "ia_seen.txt"
+    assert "mapillary-testuser-original" in cache_file.read_text()
+
+
+def test_check_ia_exists_seeds_cache_from_disk(isolated_cache):
+    """Test that the persisted cache short-circuits the HTTP probe."""
+    (isolated_cache / "ia_seen.txt").write_text("mapillary-testuser-original\n")
+
+    session = FakeSession(FakeResponse(404, {}))
+
+    assert check_ia_exists(session, "mapillary-testuser-original") is True
+    assert session.calls == []
+
+
+def test_check_ia_exists_negative_result_not_cached(isolated_cache):
+    """Test that missing collections are re-probed next time."""
+    session = FakeSession(FakeResponse(404, {}))
+
+    assert check_ia_exists(session, "mapillary-nonexistent-original") is False
+    assert check_ia_exists(session, "mapillary-nonexistent-original") is False
+
+    assert len(session.calls) == 2
+    assert not (isolated_cache / "ia_seen.txt").exists()
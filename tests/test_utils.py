@@ -1,65 +1,60 @@
 """Tests for utility functions."""
 
+import json
+import os
+from collections import deque
+from unittest.mock import patch
+
 import pytest
 from requests.exceptions import RequestException
 from mapillary_downloader.utils import format_size, format_time, safe_json_save, http_get_with_retry
 
 
-def test_format_size_bytes():
-    """Test formatting bytes."""
-    assert format_size(0) == "0 B"
-    assert format_size(500) == "500 B"
-    assert format_size(999) == "999 B"
-
-
-def test_format_size_kilobytes():
-    """Test formatting kilobytes."""
-    assert format_size(1_000) == "1.00 KB"
-    assert format_size(1_500) == "1.50 KB"
-    assert format_size(999_999) == "1000.00 KB"
-
-
-def test_format_size_megabytes():
-    """Test formatting megabytes."""
-    assert format_size(1_000_000) == "1.00 MB"
-    assert format_size(1_500_000) == "1.50 MB"
-    assert format_size(999_999_999) == "1000.00 MB"
-
-
-def test_format_size_gigabytes():
-    """Test formatting gigabytes."""
-    assert format_size(1_000_000_000) == "1.00 GB"
-    assert format_size(1_500_000_000) == "1.50 GB"
-    assert format_size(10_000_000_000) == "10.00 GB"
-
-
-def test_format_time_seconds():
-    """Test formatting seconds."""
-    assert format_time(0) == "0s"
-    assert format_time(30) == "30s"
-    assert format_time(59) == "59s"
-
-
-def test_format_time_minutes():
-    """Test formatting minutes."""
-    assert format_time(60) == "1m"
-    assert format_time(90) == "1m 30s"
-    assert format_time(120) == "2m"
-    assert format_time(3599) == "59m 59s"
-
-
-def test_format_time_hours():
-    """Test formatting hours."""
-    assert format_time(3600) == "1h"
-    assert format_time(3660) == "1h 1m"
-    assert format_time(7200) == "2h"
-    assert format_time(9000) == "2h 30m"
+@pytest.mark.parametrize(
+    ("bytes_count", "expected"),
+    [
+        (0, "0 B"),
+        (500, "500 B"),
+        (999, "999 B"),
+        (1_000, "1.00 KB"),
+        (1_500, "1.50 KB"),
+        (999_999, "1000.00 KB"),
+        (1_000_000, "1.00 MB"),
+        (1_500_000, "1.50 MB"),
+        (999_999_999, "1000.00 MB"),
+        (1_000_000_000, "1.00 GB"),
+        (1_500_000_000, "1.50 GB"),
+        (10_000_000_000, "10.00 GB"),
+    ],
+)
+def test_format_size(bytes_count, expected):
+    """Test formatting byte counts across unit boundaries."""
+    assert format_size(bytes_count) == expected
+
+
+@pytest.mark.parametrize(
+    ("seconds", "expected"),
+    [
+        (0, "0s"),
+        (30, "30s"),
+        (59, "59s"),
+        (60, "1m"),
+        (90, "1m 30s"),
+        (120, "2m"),
+        (3599, "59m 59s"),
+        (3600, "1h"),
+        (3660, "1h 1m"),
+        (7200, "2h"),
+        (9000, "2h 30m"),
+    ],
+)
+def test_format_time(seconds, expected):
+    """Test formatting durations across unit boundaries."""
+    assert format_time(seconds) == expected
 
 
 def test_safe_json_save(tmp_path):
     """Test atomic JSON save."""
-    import json
-
     test_file = tmp_path / "test.json"
     data = {"key": "value", "number": 42, "list": [1, 2, 3]}
 
@@ -73,8 +68,6 @@ def test_safe_json_save(tmp_path):
 
 def test_safe_json_save_creates_parent_dirs(tmp_path):
     """Test that safe_json_save creates parent directories."""
-    import json
-
     test_file = tmp_path / "nested" / "dirs" / "test.json"
     data = {"nested": True}
 
@@ -88,8 +81,6 @@ def test_safe_json_save_creates_parent_dirs(tmp_path):
 
 def test_safe_json_save_overwrites(tmp_path):
     """Test that safe_json_save overwrites existing files."""
-    import json
-
     test_file = tmp_path / "test.json"
 
     safe_json_save(test_file, {"old": "data"})
@@ -100,6 +91,40 @@ def test_safe_json_save_overwrites(tmp_path):
     assert loaded == {"new": "data"}
 
 
+def test_safe_json_save_leaves_no_temp_file(tmp_path):
+    """Test that the temp file is gone once the save returns."""
+    test_file = tmp_path / "test.json"
+
+    safe_json_save(test_file, {"key": "value"})
+
+    assert list(tmp_path.iterdir()) == [test_file]
+
+
+def test_safe_json_save_syncs_before_rename(tmp_path):
+    """Test that data is fsynced while still in the temp file."""
+    test_file = tmp_path / "test.json"
+    synced = []
+    real_fsync = os.fsync
+
+    def record_fsync(fd):
+        synced.append(test_file.exists())
+        return real_fsync(fd)
+
+    with patch("mapillary_downloader.utils.os.fsync", side_effect=record_fsync):
+        safe_json_save(test_file, {"key": "value"})
+
+    # Exactly one fsync, and it ran before the final file appeared
+    assert synced == [False]
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Replace retry backoff sleeps with a recorder."""
+    sleeps = []
+    monkeypatch.setattr("mapillary_downloader.utils.time.sleep", sleeps.append)
+    return sleeps
+
+
 class FakeResponse:
     """Fake response object for testing."""
 
@@ -116,12 +141,12 @@ class FakeSession:
 
     def __init__(self, responses):
         """responses is a list of FakeResponse or Exception to return in order."""
-        self.responses = list(responses)
+        self.responses = deque(responses)
         self.calls = []
 
-    def get(self, url, params=None, timeout=None):
-        self.calls.append({"url": url, "params": params, "timeout": timeout})
-        response = self.responses.pop(0)
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.calls.append({"url": url, "params": params, "timeout": timeout, "stream": stream})
+        response = self.responses.popleft()
         if isinstance(response, Exception):
             raise response
         return response
@@ -137,7 +162,7 @@ def test_http_get_with_retry_success():
     assert len(session.calls) == 1
 
 
-def test_http_get_with_retry_retry_then_success():
+def test_http_get_with_retry_retry_then_success(no_sleep):
     """Test retry after failure then success."""
     session = FakeSession(
         [
@@ -146,13 +171,14 @@ def test_http_get_with_retry_retry_then_success():
         ]
     )
 
-    result = http_get_with_retry(session, "http://example.com", max_retries=3, base_delay=0.001)
+    result = http_get_with_retry(session, "http://example.com", max_retries=3)
 
     assert result.status_code == 200
     assert len(session.calls) == 2
+    assert len(no_sleep) == 1
 
 
-def test_http_get_with_retry_all_retries_exhausted():
+def test_http_get_with_retry_all_retries_exhausted(no_sleep):
     """Test that exception is raised after all retries exhausted."""
     session = FakeSession(
         [
@@ -163,9 +189,11 @@ def test_http_get_with_retry_all_retries_exhausted():
     )
 
     with pytest.raises(RequestException):
-        http_get_with_retry(session, "http://example.com", max_retries=3, base_delay=0.001)
+        http_get_with_retry(session, "http://example.com", max_retries=3)
 
     assert len(session.calls) == 3
+    # No sleep after the final attempt
+    assert len(no_sleep) == 2
 
 
 def test_http_get_with_retry_passes_params():
@@ -178,7 +206,7 @@ def test_http_get_with_retry_passes_params():
     assert session.calls[0]["timeout"] == 30
 
 
-def test_http_get_with_retry_raises_on_http_error():
+def test_http_get_with_retry_raises_on_http_error(no_sleep):
     """Test that HTTP errors trigger retry."""
     session = FakeSession(
         [
@@ -187,7 +215,7 @@ def test_http_get_with_retry_raises_on_http_error():
         ]
     )
 
-    result = http_get_with_retry(session, "http://example.com", max_retries=3, base_delay=0.001)
+    result = http_get_with_retry(session, "http://example.com", max_retries=3)
 
     assert result.status_code == 200
     assert len(session.calls) == 2
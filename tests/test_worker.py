@@ -0,0 +1,119 @@
+"""Tests for the download worker pipeline."""
+
+import io
+
+import piexif
+from PIL import Image
+
+from mapillary_downloader.worker import download_and_convert_image
+
+
+class FakeRaw(io.BytesIO):
+    """BytesIO that tolerates the decode_content attribute set by the worker."""
+
+
+class FakeResponse:
+    """Fake response carrying image bytes."""
+
+    def __init__(self, content):
+        self.raw = FakeRaw(content)
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Fake session returning canned image data."""
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.calls.append(url)
+        return FakeResponse(self.content)
+
+
+def make_jpeg_bytes(size=(32, 16)):
+    """Build a small in-memory JPEG."""
+    buf = io.BytesIO()
+    Image.new("RGB", size, "red").save(buf, "JPEG")
+    return buf.getvalue()
+
+
+IMAGE_DATA = {
+    "id": "img1",
+    "captured_at": 1700000000000,
+    "sequence": "seq1",
+    "thumb_original_url": "http://example.com/img1.jpg",
+    "make": "TestCam",
+    "geometry": {"type": "Point", "coordinates": [-0.1, 51.5]},
+}
+
+
+def test_download_writes_jpeg_with_exif(tmp_path):
+    """Test the plain JPEG path: download, EXIF injection, single write."""
+    session = FakeSession(make_jpeg_bytes())
+
+    image_id, bytes_dl, success, error = download_and_convert_image(
+        IMAGE_DATA, str(tmp_path), "original", False, session
+    )
+
+    assert success, error
+    assert image_id == "img1"
+    assert bytes_dl > 0
+
+    final_path = tmp_path / "2023-11-14" / "seq1" / "img1.jpg"
+    assert final_path.exists()
+
+    exif = piexif.load(str(final_path))
+    assert exif["0th"][piexif.ImageIFD.Make] == b"TestCam"
+    assert piexif.GPSIFD.GPSLatitude in exif["GPS"]
+
+    # mtime is normalized to captured_at
+    assert int(final_path.stat().st_mtime) == 1700000000
+
+
+def test_download_converts_to_webp(tmp_path):
+    """Test the WebP path keeps EXIF and writes no intermediate JPEG."""
+    session = FakeSession(make_jpeg_bytes())
+
+    _, _, success, error = download_and_convert_image(IMAGE_DATA, str(tmp_path), "original", True, session)
+
+    assert success, error
+
+    final_path = tmp_path / "2023-11-14" / "seq1" / "img1.webp"
+    assert final_path.exists()
+    assert not (tmp_path / "2023-11-14" / "seq1" / "img1.jpg").exists()
+
+    with Image.open(final_path) as img:
+        assert img.format == "WEBP"
+        exif = piexif.load(img.info["exif"])
+        assert exif["0th"][piexif.ImageIFD.Make] == b"TestCam"
+
+
+def test_download_missing_url(tmp_path):
+    """Test that a missing quality URL fails without a request."""
+    session = FakeSession(b"")
+    image_data = {"id": "img2"}
+
+    image_id, bytes_dl, success, error = download_and_convert_image(
+        image_data, str(tmp_path), "original", False, session
+    )
+
+    assert not success
+    assert bytes_dl == 0
+    assert "No original URL" in error
+    assert session.calls == []
+
+
+def test_download_webp_conversion_failure(tmp_path):
+    """Test that invalid image data fails the WebP path cleanly."""
+    session = FakeSession(b"not a jpeg")
+
+    image_id, bytes_dl, success, error = download_and_convert_image(
+        IMAGE_DATA, str(tmp_path), "original", True, session
+    )
+
+    assert not success
+    assert error == "WebP conversion failed"
@@ -1,13 +1,76 @@
 """Tests for XMP writer."""
 
+import io
+import json
+import shutil
 import subprocess
 
 import piexif
+import pytest
 from PIL import Image
 
+from mapillary_downloader.webp_converter import convert_to_webp
 from mapillary_downloader.xmp_writer import build_xmp_packet, write_xmp_to_image
 
 
+class ExifToolSession:
+    """exiftool -stay_open daemon: one Perl startup for the whole module."""
+
+    def __init__(self, binary):
+        self._proc = subprocess.Popen(
+            [binary, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+
+    def read_xmp(self, image_path):
+        """Return exiftool's XMP tags for a single file as a dict."""
+        self._proc.stdin.write(f"-j\n-XMP:all\n{image_path}\n-execute\n")
+        self._proc.stdin.flush()
+        lines = []
+        while True:
+            line = self._proc.stdout.readline()
+            if not line or line.startswith("{ready"):
+                break
+            lines.append(line)
+        return json.loads("".join(lines))[0]
+
+    def close(self):
+        self._proc.stdin.write("-stay_open\nFalse\n")
+        self._proc.stdin.flush()
+        self._proc.wait(timeout=10)
+
+
+@pytest.fixture(scope="module")
+def exiftool():
+    """Shared exiftool daemon, skipping cleanly when not installed."""
+    binary = shutil.which("exiftool")
+    if not binary:
+        pytest.skip("exiftool not installed")
+    session = ExifToolSession(binary)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="module")
+def make_jpeg():
+    """Write test JPEGs, paying the libjpeg encode once per distinct size."""
+    cache = {}
+
+    def _make(path, size):
+        data = cache.get(size)
+        if data is None:
+            buf = io.BytesIO()
+            Image.new("RGB", size, color="blue").save(buf, format="JPEG")
+            data = cache[size] = buf.getvalue()
+        path.write_bytes(data)
+        return path
+
+    return _make
+
+
 def test_build_xmp_packet_basic():
     """Test XMP packet generation with basic metadata."""
     metadata = {
@@ -67,11 +130,9 @@ def test_build_xmp_packet_no_compass():
     assert "PoseHeadingDegrees" not in xmp
 
 
-def test_write_xmp_pano_basic(tmp_path):
+def test_write_xmp_pano_basic(tmp_path, exiftool, make_jpeg):
     """Test writing XMP to a panoramic image."""
-    img = Image.new("RGB", (5760, 2880), color="blue")
-    image_path = tmp_path / "pano.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "pano.jpg", (5760, 2880))
 
     metadata = {
         "id": "pano123",
@@ -84,22 +145,16 @@ def test_write_xmp_pano_basic(tmp_path):
     assert result is True
 
     # Verify with exiftool
-    output = subprocess.run(
-        ["exiftool", "-XMP:all", str(image_path)],
-        capture_output=True,
-        text=True,
-    )
+    output = exiftool.read_xmp(image_path)
 
-    assert "equirectangular" in output.stdout
-    assert "5760" in output.stdout
-    assert "2880" in output.stdout
+    assert output["ProjectionType"] == "equirectangular"
+    assert output["FullPanoWidthPixels"] == 5760
+    assert output["FullPanoHeightPixels"] == 2880
 
 
-def test_write_xmp_skips_non_pano(tmp_path):
+def test_write_xmp_skips_non_pano(tmp_path, exiftool, make_jpeg):
     """Test that XMP is not written for non-panoramic images."""
-    img = Image.new("RGB", (100, 100), color="red")
-    image_path = tmp_path / "regular.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "regular.jpg", (100, 100))
 
     metadata = {
         "id": "regular123",
@@ -112,20 +167,14 @@ def test_write_xmp_skips_non_pano(tmp_path):
     assert result is False
 
     # Verify no XMP was written
-    output = subprocess.run(
-        ["exiftool", "-XMP:all", str(image_path)],
-        capture_output=True,
-        text=True,
-    )
+    output = exiftool.read_xmp(image_path)
 
-    assert "equirectangular" not in output.stdout
+    assert "ProjectionType" not in output
 
 
-def test_write_xmp_skips_missing_is_pano(tmp_path):
+def test_write_xmp_skips_missing_is_pano(tmp_path, make_jpeg):
     """Test that XMP is not written when is_pano is missing."""
-    img = Image.new("RGB", (100, 100), color="red")
-    image_path = tmp_path / "unknown.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "unknown.jpg", (100, 100))
 
     metadata = {
         "id": "unknown123",
@@ -137,11 +186,9 @@ def test_write_xmp_skips_missing_is_pano(tmp_path):
     assert result is False
 
 
-def test_write_xmp_skips_missing_dimensions(tmp_path):
+def test_write_xmp_skips_missing_dimensions(tmp_path, make_jpeg):
     """Test that XMP is not written when dimensions are missing."""
-    img = Image.new("RGB", (100, 100), color="red")
-    image_path = tmp_path / "no_dims.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "no_dims.jpg", (100, 100))
 
     metadata = {
         "id": "no_dims",
@@ -184,11 +231,9 @@ def test_write_xmp_handles_read_error(tmp_path):
     assert result is False
 
 
-def test_write_xmp_with_compass(tmp_path):
+def test_write_xmp_with_compass(tmp_path, exiftool, make_jpeg):
     """Test writing XMP with compass heading."""
-    img = Image.new("RGB", (6720, 3360), color="green")
-    image_path = tmp_path / "pano_compass.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "pano_compass.jpg", (6720, 3360))
 
     metadata = {
         "id": "pano_compass",
@@ -201,20 +246,14 @@ def test_write_xmp_with_compass(tmp_path):
     result = write_xmp_to_image(image_path, metadata)
     assert result is True
 
-    output = subprocess.run(
-        ["exiftool", "-XMP:all", str(image_path)],
-        capture_output=True,
-        text=True,
-    )
+    output = exiftool.read_xmp(image_path)
 
-    assert "315.5" in output.stdout
+    assert output["PoseHeadingDegrees"] == 315.5
 
 
-def test_write_xmp_preserves_exif(tmp_path):
+def test_write_xmp_preserves_exif(tmp_path, exiftool, make_jpeg):
     """Test that writing XMP doesn't corrupt existing EXIF data."""
-    img = Image.new("RGB", (5760, 2880), color="purple")
-    image_path = tmp_path / "pano_exif.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "pano_exif.jpg", (5760, 2880))
 
     # Write EXIF first
     exif_dict = {
@@ -251,20 +290,14 @@ def test_write_xmp_preserves_exif(tmp_path):
     assert exif_check["GPS"][piexif.GPSIFD.GPSLatitudeRef] == b"N"
 
     # Verify XMP is present
-    output = subprocess.run(
-        ["exiftool", "-XMP:all", str(image_path)],
-        capture_output=True,
-        text=True,
-    )
-    assert "equirectangular" in output.stdout
+    output = exiftool.read_xmp(image_path)
+    assert output["ProjectionType"] == "equirectangular"
 
 
-def test_write_xmp_survives_webp_conversion(tmp_path):
+def test_write_xmp_survives_webp_conversion(tmp_path, exiftool, make_jpeg):
     """Test that XMP survives JPEG to WebP conversion."""
-    img = Image.new("RGB", (5760, 2880), color="cyan")
-    jpg_path = tmp_path / "pano.jpg"
+    jpg_path = make_jpeg(tmp_path / "pano.jpg", (5760, 2880))
     webp_path = tmp_path / "pano.webp"
-    img.save(jpg_path)
 
     metadata = {
         "id": "pano_webp",
@@ -278,31 +311,22 @@ def test_write_xmp_survives_webp_conversion(tmp_path):
     assert result is True
 
     # Convert to WebP with metadata preservation
-    convert_result = subprocess.run(
-        ["cwebp", "-metadata", "all", str(jpg_path), "-o", str(webp_path)],
-        capture_output=True,
-    )
-    assert convert_result.returncode == 0
+    convert_result = convert_to_webp(jpg_path, webp_path, delete_original=False)
+    assert convert_result is not None
     assert webp_path.exists()
 
     # Verify XMP in WebP
-    output = subprocess.run(
-        ["exiftool", "-XMP:all", str(webp_path)],
-        capture_output=True,
-        text=True,
-    )
+    output = exiftool.read_xmp(webp_path)
 
-    assert "equirectangular" in output.stdout
-    assert "5760" in output.stdout
-    assert "2880" in output.stdout
-    assert "45.0" in output.stdout
+    assert output["ProjectionType"] == "equirectangular"
+    assert output["FullPanoWidthPixels"] == 5760
+    assert output["FullPanoHeightPixels"] == 2880
+    assert output["PoseHeadingDegrees"] == 45.0
 
 
-def test_write_xmp_replaces_existing(tmp_path):
+def test_write_xmp_replaces_existing(tmp_path, exiftool, make_jpeg):
     """Test that writing XMP twice replaces the first XMP."""
-    img = Image.new("RGB", (1000, 500), color="yellow")
-    image_path = tmp_path / "pano_replace.jpg"
-    img.save(image_path)
+    image_path = make_jpeg(tmp_path / "pano_replace.jpg", (1000, 500))
 
     # Write first XMP
     metadata1 = {
@@ -326,12 +350,8 @@ def test_write_xmp_replaces_existing(tmp_path):
     assert result is True
 
     # Verify only new compass is present
-    output = subprocess.run(
-        ["exiftool", "-XMP:all", str(image_path)],
-        capture_output=True,
-        text=True,
-    )
-
-    assert "270.0" in output.stdout
-    # Old value should be replaced
-    assert output.stdout.count("Pose Heading") == 1
+    output = exiftool.read_xmp(image_path)
+
+    # Old value must have been replaced, not duplicated; exiftool would
+    # report a list if two PoseHeadingDegrees tags were present
+    assert output["PoseHeadingDegrees"] == 270.0